@@ -0,0 +1,185 @@
+"""
+Per-API-key admission control and prioritised chart computation.
+
+Each API key has a priority class, an optional token-bucket rate limit and an
+optional cap on in-flight requests. Admitted chart computations are queued on
+a single compute thread (immanuel's settings are process-global, so charts
+are never computed concurrently within a process), and interactive work is
+always taken from the queue before bulk work.
+
+Limits apply per server process.
+"""
+
+import asyncio
+import heapq
+import itertools
+import json
+import math
+import threading
+import time
+from typing import Callable, Dict, Literal, Optional
+
+from immanuel.setup import settings
+from pydantic import BaseModel, Field
+
+from config import config
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+
+# Lower runs first
+PRIORITIES = {INTERACTIVE: 0, BULK: 1}
+
+
+class ApiKey(BaseModel):
+    name: str = Field(...)
+    priority: Literal["interactive", "bulk"] = Field(INTERACTIVE)
+    rate: Optional[float] = Field(None, gt=0, description="Sustained requests per second; unlimited if omitted")
+    burst: Optional[int] = Field(None, gt=0, description="Bucket size; defaults to max(1, rate)")
+    max_concurrency: Optional[int] = Field(None, gt=0, description="Maximum in-flight requests; unlimited if omitted")
+
+
+def load_api_keys() -> Dict[str, ApiKey]:
+    """
+    Builds the key table from config.API_KEYS (a JSON object mapping each key
+    to its settings) plus the single legacy config.API_KEY, which is an
+    unlimited interactive key.
+
+    When API_KEYS is set, the legacy key is only added if API_KEY was set
+    explicitly, and the public placeholder is refused, so it can never
+    bypass the configured limits. Raises ValueError in that case.
+    """
+    extra = json.loads(config.API_KEYS or "{}")
+    keys = {}
+    if not extra:
+        keys[config.API_KEY] = ApiKey(name="default")
+    elif config.API_KEY_SET:
+        if config.API_KEY == config.PLACEHOLDER_API_KEY:
+            raise ValueError(
+                "API_KEY is still the placeholder from env.example. "
+                "Set a real key, or remove API_KEY to use only API_KEYS."
+            )
+        keys[config.API_KEY] = ApiKey(name="default")
+    for key, options in extra.items():
+        keys[key] = ApiKey(**options)
+    return keys
+
+
+class TokenBucket:
+    """Classic token bucket: refills at rate tokens/second up to burst."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Takes a token. Returns 0 on success, or seconds until one is available."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimited(Exception):
+    def __init__(self, detail: str, retry_after: float) -> None:
+        super().__init__(detail)
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class Admission:
+    """Tracks rate limits and in-flight requests per key. Used from the event loop only."""
+
+    def __init__(self, keys: Dict[str, ApiKey]) -> None:
+        self.keys = keys
+        self._buckets = {
+            key: TokenBucket(api_key.rate, api_key.burst or max(1, math.ceil(api_key.rate)))
+            for key, api_key in keys.items()
+            if api_key.rate is not None
+        }
+        self._in_flight = {key: 0 for key in keys}
+
+    def acquire(self, key: str) -> None:
+        """Admits one request for the key, or raises RateLimited."""
+        api_key = self.keys[key]
+        if api_key.max_concurrency is not None and self._in_flight[key] >= api_key.max_concurrency:
+            raise RateLimited(f"Too many concurrent requests (limit {api_key.max_concurrency}).", 1.0)
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            wait = bucket.take()
+            if wait:
+                raise RateLimited(f"Rate limit exceeded ({api_key.rate:g} requests/second).", wait)
+        self._in_flight[key] += 1
+
+    def release(self, key: str) -> None:
+        self._in_flight[key] -= 1
+
+
+class ChartScheduler:
+    """Runs submitted computations one at a time on a worker thread, interactive first."""
+
+    def __init__(self) -> None:
+        self._heap = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def queued(self) -> Dict[str, int]:
+        """Number of computations waiting in each priority lane."""
+        with self._condition:
+            counts = {name: 0 for name in PRIORITIES}
+            lanes = {rank: name for name, rank in PRIORITIES.items()}
+            for rank, *_ in self._heap:
+                counts[lanes[rank]] += 1
+            return counts
+
+    async def run(self, priority: str, compute: Callable):
+        """Queues compute() in the given priority lane and waits for its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._condition:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._work, name="chart-scheduler", daemon=True)
+                self._thread.start()
+            # The sequence number keeps each lane first-in, first-out
+            heapq.heappush(self._heap, (PRIORITIES[priority], next(self._sequence), compute, future, loop))
+            self._condition.notify()
+        return await future
+
+    def _work(self) -> None:
+        # swisseph keeps the ephemeris path per thread, and immanuel only sets
+        # it on the main thread at import
+        settings.set_swe_filepath()
+        while True:
+            with self._condition:
+                while not self._heap:
+                    self._condition.wait()
+                _, _, compute, future, loop = heapq.heappop(self._heap)
+
+            # Skip work whose caller has gone away (e.g. client disconnected)
+            if future.cancelled():
+                continue
+            try:
+                result = compute()
+            except Exception as e:
+                loop.call_soon_threadsafe(_resolve, future, None, e)
+            else:
+                loop.call_soon_threadsafe(_resolve, future, result, None)
+
+
+def _resolve(future: asyncio.Future, result, error: Optional[Exception]) -> None:
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+admission = Admission(load_api_keys())
+scheduler = ChartScheduler()
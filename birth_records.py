@@ -0,0 +1,160 @@
+"""
+Birth data validation shared by the API (main.py) and the bulk CLI (bulk_charts.py).
+
+Nothing here depends on FastAPI: invalid input raises ValueError, which the
+API turns into a 422 response and the CLI reports and skips.
+"""
+
+import json
+from typing import Optional
+
+from immanuel.const import chart
+from pydantic import BaseModel, Field
+
+from gazetteer import Place, resolve_place, suggest_place
+
+house_system_map = {
+    "whole_sign": chart.WHOLE_SIGN,
+    "placidus": chart.PLACIDUS,
+}
+
+
+class BirthData(BaseModel):
+    date: str = Field(...)
+    time: str = Field(...)
+    place: str = Field(...)
+    latitude: Optional[float] = Field(None, description="Omit latitude/longitude to resolve them from 'place'")
+    longitude: Optional[float] = Field(None, description="Omit latitude/longitude to resolve them from 'place'")
+    house_system: Optional[str] = Field("whole_sign", description="House system to use: 'whole_sign' (default) or 'placidus'")
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "date": "1990-01-01",
+                    "time": "12:00:00",
+                    "place": "New York, USA",
+                    "latitude": 40.7128,
+                    "longitude": -74.0060,
+                    "house_system": "whole_sign"
+                },
+                {
+                    "date": "1991-12-10",
+                    "time": "04:59:00",
+                    "place": "Melbourne, Victoria, Australia",
+                    "house_system": "whole_sign"
+                }
+            ]
+        }
+    }
+
+
+def resolve_location(birth_data: BirthData):
+    """
+    Returns (latitude, longitude, timezone) for the birth data, resolving
+    the place name from the bundled gazetteer when coordinates are omitted.
+    The timezone is None when explicit coordinates are given. Raises
+    ValueError if only one coordinate is given or the place is unknown.
+    """
+    check_coordinates(birth_data)
+    if birth_data.latitude is not None:
+        return birth_data.latitude, birth_data.longitude, None
+    return locate_place(birth_data.place)
+
+
+def check_coordinates(birth_data: BirthData) -> None:
+    """Raises ValueError if only one of latitude and longitude is given."""
+    if (birth_data.latitude is None) != (birth_data.longitude is None):
+        raise ValueError("Provide both latitude and longitude, or neither to resolve them from 'place'.")
+
+
+def locate_place(query: str):
+    """
+    Returns (latitude, longitude, timezone) for a place name from the bundled
+    gazetteer. Raises ValueError, with a suggestion if there is one, when the
+    place cannot be resolved.
+    """
+    place = resolve_place(query)
+    if place is None:
+        suggestion = suggest_place(query)
+        hint = f" Did you mean '{describe_place(suggestion)}'?" if suggestion else ""
+        raise ValueError(
+            f"Could not resolve place '{query}'.{hint} "
+            "Add the region or country, or provide latitude and longitude."
+        )
+    return place.latitude, place.longitude, place.timezone
+
+
+def describe_place(place: Place) -> str:
+    return ", ".join(part for part in (place.name, place.admin, place.country) if part)
+
+
+def resolved_place(birth_data: BirthData) -> Optional[dict]:
+    """
+    Returns the gazetteer place used for the birth data, so clients can check
+    it, or None when explicit coordinates were given.
+    """
+    if birth_data.latitude is not None and birth_data.longitude is not None:
+        return None
+    place = resolve_place(birth_data.place)
+    return {
+        "name": place.name,
+        "admin": place.admin,
+        "country": place.country,
+        "timezone": place.timezone,
+        "latitude": place.latitude,
+        "longitude": place.longitude,
+    }
+
+
+def birth_record(row, number: int, resolve: bool = True) -> dict:
+    """
+    Validates one bulk input record (a CSV row dict or an NDJSON line) and
+    returns it normalised for chart computation. An optional "id" field
+    labels the subject; otherwise the record number is used. Raises
+    ValueError with the record number on invalid input.
+
+    With resolve=False the place is not looked up: records without
+    coordinates keep latitude and longitude as None, and record_location()
+    resolves them later.
+    """
+    try:
+        if isinstance(row, str):
+            row = json.loads(row)
+            if not isinstance(row, dict):
+                raise ValueError("expected a JSON object")
+        # Empty CSV cells mean "not provided"
+        row = {key: value for key, value in row.items() if value not in ("", None)}
+        subject = str(row.pop("id", number))
+        # pydantic's ValidationError is a ValueError
+        birth_data = BirthData(**row)
+        if resolve:
+            latitude, longitude, timezone = resolve_location(birth_data)
+        else:
+            check_coordinates(birth_data)
+            latitude, longitude, timezone = birth_data.latitude, birth_data.longitude, None
+    except ValueError as e:
+        raise ValueError(f"Record {number}: {e}") from e
+
+    return {
+        "subject": subject,
+        "date_time": f"{birth_data.date} {birth_data.time}",
+        "place": birth_data.place,
+        "latitude": latitude,
+        "longitude": longitude,
+        "timezone": timezone,
+        "house_system": house_system_map.get(
+            (birth_data.house_system or "whole_sign").lower(), chart.WHOLE_SIGN
+        ),
+    }
+
+
+def record_location(record: dict):
+    """
+    Returns (latitude, longitude, timezone) for a record from birth_record(),
+    resolving its place if that was deferred. Raises ValueError if the place
+    is unknown.
+    """
+    if record["latitude"] is None:
+        return locate_place(record["place"])
+    return record["latitude"], record["longitude"], record["timezone"]
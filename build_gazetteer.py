@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Builds data/gazetteer.csv from the GeoNames dumps (https://download.geonames.org/export/dump/).
+
+Download and unzip these into one directory first:
+    cities15000.txt       every place with a population of at least 15,000
+    admin1CodesASCII.txt  state/province names
+    countryInfo.txt       country names
+
+Examples:
+    python build_gazetteer.py ~/geonames
+    python build_gazetteer.py ~/geonames -o /tmp/gazetteer.csv
+
+GeoNames data is licensed under CC BY 4.0 (https://creativecommons.org/licenses/by/4.0/).
+"""
+
+import argparse
+import csv
+import os
+import sys
+
+COLUMNS = ("name", "admin", "admin_code", "country", "country_code", "latitude", "longitude", "timezone", "population")
+
+# Postal abbreviations for regions whose GeoNames admin1 code is numeric.
+# US states already use their postal codes in GeoNames.
+ADMIN_ABBREVIATIONS = {
+    "AU": {
+        "Australian Capital Territory": "ACT",
+        "New South Wales": "NSW",
+        "Northern Territory": "NT",
+        "Queensland": "QLD",
+        "South Australia": "SA",
+        "Tasmania": "TAS",
+        "Victoria": "VIC",
+        "Western Australia": "WA",
+    },
+    "CA": {
+        "Alberta": "AB",
+        "British Columbia": "BC",
+        "Manitoba": "MB",
+        "New Brunswick": "NB",
+        "Newfoundland and Labrador": "NL",
+        "Northwest Territories": "NT",
+        "Nova Scotia": "NS",
+        "Nunavut": "NU",
+        "Ontario": "ON",
+        "Prince Edward Island": "PE",
+        "Quebec": "QC",
+        "Saskatchewan": "SK",
+        "Yukon": "YT",
+    },
+}
+
+def read_tsv(path):
+    """Yields the fields of each non-comment line of a GeoNames dump."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip() and not line.startswith("#"):
+                yield line.rstrip("\n").split("\t")
+
+def admin_code(country_code, code, name):
+    """Returns the abbreviation used as a qualifier, or "" when there is no usable one."""
+    abbreviation = ADMIN_ABBREVIATIONS.get(country_code, {}).get(name)
+    if abbreviation:
+        return abbreviation
+    # Numeric codes (e.g. Brazil's "27") mean nothing to users
+    return code if code.isalpha() else ""
+
+def build(source_dir):
+    """Returns the gazetteer rows, most populous first."""
+    countries = {
+        fields[0]: fields[4]
+        for fields in read_tsv(os.path.join(source_dir, "countryInfo.txt"))
+    }
+    admins = {
+        fields[0]: fields[2]
+        for fields in read_tsv(os.path.join(source_dir, "admin1CodesASCII.txt"))
+    }
+
+    rows = []
+    for fields in read_tsv(os.path.join(source_dir, "cities15000.txt")):
+        country_code, code = fields[8], fields[10]
+        admin = admins.get(f"{country_code}.{code}", "")
+        rows.append((
+            fields[1],
+            admin,
+            admin_code(country_code, code, admin),
+            countries.get(country_code, ""),
+            country_code,
+            fields[4],
+            fields[5],
+            fields[17],
+            int(fields[14] or 0),
+        ))
+    rows.sort(key=lambda row: (-row[8], row[0]))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the gazetteer CSV from GeoNames dumps.")
+    parser.add_argument("source_dir", help="Directory containing cities15000.txt, admin1CodesASCII.txt and countryInfo.txt")
+    parser.add_argument("-o", "--output", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "gazetteer.csv"), help="Output CSV (default: data/gazetteer.csv)")
+    args = parser.parse_args()
+
+    rows = build(args.source_dir)
+    with open(args.output, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(COLUMNS)
+        writer.writerows(rows)
+    print(f"✅ Wrote {len(rows)} places to {args.output}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Bulk chart generator - computes charts in-process, without the HTTP API.
+
+Reads birth records (same fields as POST /birth-chart, plus an optional "id")
+as CSV or NDJSON from a file or stdin, computes them across a pool of worker
+processes and writes either NDJSON (one chart per line, same JSON as the API)
+or the text table printed by melbourne_birth_chart.py.
+
+Examples:
+    python bulk_charts.py births.csv -o charts.ndjson
+    cat births.ndjson | python bulk_charts.py --format table
+    python bulk_charts.py births.csv --chart transits --workers 8
+"""
+
+import argparse
+import csv
+import itertools
+import multiprocessing
+import sys
+import time
+
+from immanuel import charts
+from immanuel.classes.serialize import ToJSON
+from immanuel.const import calc, chart, names
+from immanuel.setup import settings
+from immanuel.tools import ephemeris, position
+
+import chart_settings  # applies the API's chart objects
+from birth_records import birth_record
+from chart_display import PLANET_EMOJI, format_degree
+from compact import RawNatal, RawTransits
+
+def read_records(stream, stats):
+    """
+    Yields normalised records from CSV or NDJSON input (detected from the
+    first non-blank character) as the input is read, so large piped inputs
+    are streamed. Invalid records are reported on stderr, counted in
+    stats["skipped"] and skipped.
+    """
+    lines = iter(stream)
+    first = next((line for line in lines if line.strip()), "")
+    lines = itertools.chain([first], lines)
+    if first.lstrip().startswith("{"):
+        rows = (line for line in lines if line.strip())
+    else:
+        rows = csv.DictReader(lines)
+
+    for number, row in enumerate(rows, 1):
+        try:
+            yield birth_record(row, number)
+        except ValueError as e:
+            print(f"\n⚠️  Skipping {e}", file=sys.stderr)
+            stats["skipped"] += 1
+
+def format_sign_degree(longitude):
+    """Convert absolute longitude to sign-relative degree (e.g., 17°09')"""
+    return format_degree(position.sign_longitude(longitude))
+
+def format_table(record, result):
+    """Format one chart's raw objects as the melbourne_birth_chart.py text table."""
+    lines = [
+        f"🌟 {record['subject']}: {record['date_time']} at {record['latitude']}, {record['longitude']}",
+        "=" * 60,
+        "🌞 PLANETS & ANGLES:",
+        "-" * 40,
+    ]
+    houses = []
+    for object in result._objects.values():
+        sign = names.SIGNS[position.sign(object)]
+        degree = format_sign_degree(object["lon"])
+        if object["type"] == chart.HOUSE:
+            houses.append(f"🏠 {object['name']:10} {sign:12} {degree}")
+            continue
+        retrograde = (
+            object["type"] not in (chart.ANGLE, chart.FIXED_STAR)
+            and ephemeris.object_movement(object) == calc.RETROGRADE
+        )
+        emoji = PLANET_EMOJI.get(object["name"], "•")
+        retrograde_symbol = " ℞" if retrograde else ""
+        lines.append(f"{emoji} {object['name']:15} {sign:12} {degree}{retrograde_symbol}")
+
+    if houses:
+        lines += ["", "🏠 HOUSE CUSPS:", "-" * 40] + houses
+    return "\n".join(lines) + "\n\n"
+
+def init_worker(objects):
+    settings.objects = objects
+
+def compute(task):
+    """Compute and format one chart. Returns (output, error)."""
+    record, chart_type, output_format = task
+    wrapped = output_format == "ndjson"
+    try:
+        settings.house_system = record["house_system"]
+        subject = charts.Subject(
+            date_time=record["date_time"],
+            latitude=record["latitude"],
+            longitude=record["longitude"],
+            timezone=record["timezone"]
+        )
+        if chart_type == "transits":
+            transits_class = charts.Transits if wrapped else RawTransits
+            result = transits_class(
+                latitude=record["latitude"],
+                longitude=record["longitude"],
+                aspects_to=RawNatal(subject)
+            )
+        else:
+            result = (charts.Natal if wrapped else RawNatal)(subject)
+
+        if wrapped:
+            return ToJSON().encode({"id": record["subject"], "chart": result}) + "\n", None
+        return format_table(record, result), None
+    except Exception as e:
+        error = f"Record {record['subject']}: {e}"
+        if wrapped:
+            return ToJSON().encode({"id": record["subject"], "error": str(e)}) + "\n", error
+        return None, error
+
+def report_progress(done, failed, started):
+    elapsed = time.perf_counter() - started
+    rate = done / elapsed if elapsed else 0.0
+    print(
+        f"\r⏳ {done} charts ({failed} failed) - {rate:.1f} charts/s",
+        end="", file=sys.stderr, flush=True
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute charts in bulk without the HTTP API.")
+    parser.add_argument("input", nargs="?", default="-", help="CSV or NDJSON file of birth records (default: stdin)")
+    parser.add_argument("-o", "--output", default="-", help="Output file (default: stdout)")
+    parser.add_argument("-f", "--format", choices=["ndjson", "table"], default="ndjson", help="Output format (default: ndjson)")
+    parser.add_argument("-c", "--chart", choices=["natal", "transits"], default="natal", help="Chart type (default: natal)")
+    parser.add_argument("-w", "--workers", type=int, default=multiprocessing.cpu_count(), help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunksize", type=int, default=16, help="Records sent to a worker at a time (default: 16)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Don't report progress")
+    args = parser.parse_args()
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    stats = {"skipped": 0}
+    tasks = ((record, args.chart, args.format) for record in read_records(source, stats))
+    done, failed = 0, 0
+    started = time.perf_counter()
+    last_report = 0.0
+
+    try:
+        with multiprocessing.Pool(args.workers, initializer=init_worker, initargs=(list(settings.objects),)) as pool:
+            for text, error in pool.imap(compute, tasks, chunksize=args.chunksize):
+                done += 1
+                if text is not None:
+                    output.write(text)
+                if error is not None:
+                    failed += 1
+                    if not args.quiet:
+                        print(f"\n❌ {error}", file=sys.stderr)
+                if not args.quiet and time.perf_counter() - last_report >= 1:
+                    last_report = time.perf_counter()
+                    report_progress(done, failed, started)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+
+    elapsed = time.perf_counter() - started
+    if not args.quiet:
+        report_progress(done, failed, started)
+        print(file=sys.stderr)
+    print(
+        f"📊 {done} charts in {elapsed:.2f}s ({done / elapsed if elapsed else 0:.1f} charts/s, "
+        f"{args.workers} workers) - {failed} failed, {stats['skipped']} skipped",
+        file=sys.stderr
+    )
+    return 1 if failed or stats["skipped"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
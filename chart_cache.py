@@ -0,0 +1,53 @@
+"""
+Process-wide cache of computed natal charts.
+
+A natal chart depends only on the birth moment, location and house system,
+so identical inputs share one cached chart whether they arrive via
+/birth-chart, /transits, /synastry or /composite. Charts are held as
+CompactChart records, so the cache can retain thousands of them cheaply.
+"""
+
+from functools import lru_cache
+from typing import Optional
+
+from immanuel import charts
+from immanuel.setup import settings
+
+from compact import CompactChart, RawNatal
+from config import config
+
+
+@lru_cache(maxsize=config.CHART_CACHE_SIZE)
+def get_compact_natal(
+    date_time: str,
+    latitude: float,
+    longitude: float,
+    timezone: Optional[str],
+    house_system: int,
+) -> CompactChart:
+    """Returns the compact natal chart for the given inputs, computing it at most once per process."""
+    settings.house_system = house_system
+    subject = charts.Subject(
+        date_time=date_time,
+        latitude=latitude,
+        longitude=longitude,
+        timezone=timezone
+    )
+    return CompactChart(RawNatal(subject))
+
+
+def get_natal(
+    date_time: str,
+    latitude: float,
+    longitude: float,
+    timezone: Optional[str],
+    house_system: int,
+    wrapped: bool = True,
+) -> charts.Chart:
+    """
+    Returns the natal chart for the given inputs from the cache. Pass
+    wrapped=False when only the raw data is needed (aspects, composites),
+    which skips regenerating the formatted output.
+    """
+    compact = get_compact_natal(date_time, latitude, longitude, timezone, house_system)
+    return compact.to_chart(wrapped)
@@ -0,0 +1,21 @@
+"""
+Display helpers shared by the scripts that print charts as text tables
+(melbourne_birth_chart.py and bulk_charts.py).
+"""
+
+PLANET_EMOJI = {
+    "Sun": "☀️", "Moon": "🌙", "Mercury": "☿", "Venus": "♀️",
+    "Mars": "♂️", "Jupiter": "♃", "Saturn": "♄", "Uranus": "♅",
+    "Neptune": "♆", "Pluto": "♇", "North Node": "☊",
+    "Lilith": "⚸", "Chiron": "⚷", "Part of Fortune": "⚸",
+    "Vertex": "⚸", "Asc": "🔼", "MC": "🔽"
+}
+
+def format_degree(deg_in_sign):
+    """Format a sign-relative longitude as degrees and minutes (e.g., 17°09')"""
+    degrees = int(deg_in_sign)
+    minutes = int(round((deg_in_sign - degrees) * 60))
+    if minutes == 60:
+        degrees += 1
+        minutes = 0
+    return f"{degrees}°{minutes:02d}'"
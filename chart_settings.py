@@ -0,0 +1,19 @@
+"""
+immanuel settings shared by the API, bulk jobs and the bulk CLI.
+Importing this module applies them.
+"""
+
+from immanuel.const import chart
+from immanuel.setup import settings
+
+# Set the objects to include all required points, including all 12 house cusps
+settings.objects = [
+    chart.SUN, chart.MOON, chart.MERCURY, chart.VENUS, chart.MARS, chart.JUPITER, chart.SATURN,
+    chart.URANUS, chart.NEPTUNE, chart.PLUTO, chart.NORTH_NODE, chart.LILITH, chart.CHIRON,
+    chart.PART_OF_FORTUNE, chart.VERTEX, chart.ASC, chart.MC,
+    chart.HOUSE1, chart.HOUSE2, chart.HOUSE3, chart.HOUSE4, chart.HOUSE5, chart.HOUSE6,
+    chart.HOUSE7, chart.HOUSE8, chart.HOUSE9, chart.HOUSE10, chart.HOUSE11, chart.HOUSE12
+]
+
+# Set whole sign as the default house system
+settings.house_system = chart.WHOLE_SIGN
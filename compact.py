@@ -0,0 +1,197 @@
+"""
+Compact in-memory representation of computed charts.
+
+A wrapped immanuel chart is a deep tree of objects holding formatted strings
+for every angle, which is expensive to keep around in caches or batches.
+CompactChart keeps only the raw ephemeris data the chart was generated from:
+every float goes into a single array('d'), while the keys, names and integer
+indices that are the same for every chart with the same configured objects
+live in a shared, interned layout. Calling to_chart() regenerates the wrapped
+chart, whose ToJSON output is identical to the original's.
+"""
+
+from array import array
+from typing import Dict, Optional, Tuple
+
+from immanuel import charts
+from immanuel.classes import wrap
+from immanuel.const import chart
+from immanuel.setup import settings
+
+SUPPORTED_CHART_TYPES = (chart.NATAL, chart.COMPOSITE, chart.TRANSITS)
+
+SUBJECT_FIELDS = (
+    "latitude",
+    "longitude",
+    "timezone_offset",
+    "timezone",
+    "time_is_dst",
+    "date_time",
+    "date_time_ambiguous",
+    "julian_date",
+)
+
+# Marks a houses/triad entry that is identical to the chart object of the same index
+ALIAS = "alias"
+
+# Interned layouts, so every chart with the same shape shares one tuple
+_layouts: Dict[tuple, tuple] = {}
+
+
+def _intern(layout: tuple) -> tuple:
+    return _layouts.setdefault(layout, layout)
+
+
+def _pack_entry(entry: dict, values: array) -> tuple:
+    """Appends an object's float values and returns the entry's layout."""
+    static, float_keys = [], []
+    for key, value in entry.items():
+        if type(value) is float:
+            float_keys.append(key)
+            values.append(value)
+        else:
+            static.append((key, value))
+    return tuple(static), tuple(float_keys)
+
+
+def _unpack_entry(static: tuple, float_keys: tuple, values: array, position: int) -> Tuple[dict, int]:
+    entry = dict(static)
+    for key in float_keys:
+        entry[key] = values[position]
+        position += 1
+    return entry, position
+
+
+def _pack_subject(subject: charts.Subject) -> tuple:
+    return tuple(getattr(subject, field) for field in SUBJECT_FIELDS)
+
+
+def _unpack_subject(fields: tuple) -> charts.Subject:
+    subject = charts.Subject.__new__(charts.Subject)
+    subject.__dict__.update(zip(SUBJECT_FIELDS, fields))
+    return subject
+
+
+class RawNatal(charts.Natal):
+    """Natal chart that generates the raw ephemeris data but skips building
+    the formatted output, for charts that are only packed or tabulated."""
+
+    def wrap(self) -> None:
+        pass
+
+
+class RawTransits(charts.Transits):
+    """Transits chart that generates the raw ephemeris data but skips
+    building the formatted output."""
+
+    def wrap(self) -> None:
+        pass
+
+
+class CompactChart:
+    """Raw data for one chart, stored as a flat float array plus a shared layout."""
+
+    __slots__ = (
+        "chart_type",
+        "house_system",
+        "native",
+        "partner",
+        "obliquity",
+        "diurnal",
+        "moon_phase",
+        "aspects_to",
+        "layout",
+        "values",
+    )
+
+    def __init__(self, source: charts.Chart, aspects_to: Optional["CompactChart"] = None) -> None:
+        """
+        Packs a computed chart. If the chart was generated with aspects_to,
+        pass the compact form of that chart so aspects can be regenerated.
+        """
+        if source._type not in SUPPORTED_CHART_TYPES:
+            raise ValueError(f"Unsupported chart type: {source.type}")
+        if (source._aspects_to is None) != (aspects_to is None):
+            raise ValueError("aspects_to must be given exactly when the chart has aspects_to")
+
+        self.chart_type = source._type
+        self.house_system = settings.house_system
+        self.native = _pack_subject(source._native)
+        self.partner = _pack_subject(source._partner) if hasattr(source, "_partner") else None
+        self.obliquity = source._obliquity
+        self.diurnal = source._diurnal
+        self.moon_phase = source._moon_phase
+        self.aspects_to = aspects_to
+
+        values = array("d")
+        objects = tuple(_pack_entry(entry, values) for entry in source._objects.values())
+        houses = tuple(
+            ALIAS if source._objects.get(index) == entry else _pack_entry(entry, values)
+            for index, entry in source._houses.items()
+        )
+        triad = tuple(
+            (index, ALIAS if source._objects.get(index) == entry else _pack_entry(entry, values))
+            for index, entry in source._triad.items()
+        )
+        self.layout = _intern((tuple(source._objects), objects, tuple(source._houses), houses, triad))
+        self.values = values
+
+    def unpack(self) -> Tuple[dict, dict, dict]:
+        """Returns the raw (objects, houses, triad) dicts the chart was generated from."""
+        object_indices, object_layouts, house_indices, house_layouts, triad_layouts = self.layout
+        position = 0
+
+        objects = {}
+        for index, (static, float_keys) in zip(object_indices, object_layouts):
+            objects[index], position = _unpack_entry(static, float_keys, self.values, position)
+
+        houses = {}
+        for index, house_layout in zip(house_indices, house_layouts):
+            if house_layout == ALIAS:
+                houses[index] = dict(objects[index])
+            else:
+                houses[index], position = _unpack_entry(*house_layout, self.values, position)
+
+        triad = {}
+        for index, triad_layout in triad_layouts:
+            if triad_layout == ALIAS:
+                triad[index] = dict(objects[index])
+            else:
+                triad[index], position = _unpack_entry(*triad_layout, self.values, position)
+
+        return objects, houses, triad
+
+    def to_chart(self, wrapped: bool = True) -> charts.Chart:
+        """
+        Regenerates the chart. With wrapped=False only the raw data is
+        restored, which is enough for aspect and house calculations.
+        """
+        return RestoredChart(self, wrapped)
+
+
+class RestoredChart(charts.Chart):
+    """Chart regenerated from a CompactChart rather than from the ephemeris."""
+
+    def __init__(self, compact: CompactChart, wrapped: bool = True) -> None:
+        self._compact = compact
+        self._wrapped = wrapped
+        self._native = _unpack_subject(compact.native)
+        if compact.partner is not None:
+            self._partner = _unpack_subject(compact.partner)
+        aspects_to = compact.aspects_to.to_chart(wrapped=False) if compact.aspects_to else None
+        settings.house_system = compact.house_system
+        super().__init__(compact.chart_type, aspects_to)
+
+    def generate(self) -> None:
+        self._objects, self._houses, triad = self._compact.unpack()
+        self._triad.update(triad)
+        self._obliquity = self._compact.obliquity
+        self._diurnal = self._compact.diurnal
+        self._moon_phase = self._compact.moon_phase
+
+    def wrap(self) -> None:
+        if self._wrapped:
+            super().wrap()
+
+    def set_wrapped_partner(self) -> None:
+        self.partner = wrap.Subject(self._partner)
@@ -8,7 +8,14 @@ class Config:
     """Configuration class for the Astrology API."""
     
     # API Key settings
-    API_KEY = os.getenv("API_KEY", "your-secret-api-key-here")
+    PLACEHOLDER_API_KEY = "your-secret-api-key-here"
+    API_KEY = os.getenv("API_KEY") or PLACEHOLDER_API_KEY
+    # Whether API_KEY was set in the environment (or .env) rather than defaulted
+    API_KEY_SET = bool(os.getenv("API_KEY"))
+
+    # Additional API keys with per-key limits, as a JSON object, e.g.
+    # {"key": {"name": "web", "priority": "interactive", "rate": 5, "burst": 10, "max_concurrency": 4}}
+    API_KEYS = os.getenv("API_KEYS", "")
     
     # Allowed origins for CORS (if you want to add CORS later)
     ALLOWED_ORIGINS: List[str] = [
@@ -25,5 +32,21 @@ class Config:
     HOST = os.getenv("HOST", "0.0.0.0")
     PORT = int(os.getenv("PORT", "8000"))
 
+    # Number of computed natal charts kept in memory for reuse
+    CHART_CACHE_SIZE = int(os.getenv("CHART_CACHE_SIZE", "4096"))
+
+    # Bulk jobs: storage directory, records per checkpointed chunk, worker processes
+    JOBS_DIR = os.getenv("JOBS_DIR", "jobs")
+    JOB_CHUNK_SIZE = int(os.getenv("JOB_CHUNK_SIZE", "500"))
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", str(os.cpu_count() or 1)))
+    # Niceness added to job worker processes so API requests get the CPU first
+    JOB_WORKER_NICE = int(os.getenv("JOB_WORKER_NICE", "10"))
+
+    # Gazetteer used to resolve place names when coordinates are omitted
+    GAZETTEER_PATH = os.getenv(
+        "GAZETTEER_PATH",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "gazetteer.csv"),
+    )
+
 # Create a config instance
 config = Config() 
\ No newline at end of file
@@ -0,0 +1,299 @@
+"""
+Offline place-name resolution for the Astrology API.
+
+The bundled gazetteer (data/gazetteer.csv) is loaded once into an in-memory
+index so a free-text place such as "Melbourne, Victoria, Australia" resolves
+to coordinates and an IANA timezone without any network round trip.
+
+Lookups try, in order:
+    1. an exact match on the normalised city name,
+    2. a prefix match over the sorted name list (e.g. "San Fran, CA"),
+    3. a trigram similarity match for misspellings (e.g. "Melborne, Australia").
+Any comma-separated qualifiers after the city name ("Victoria", "BC",
+"Australia", "USA") are matched against the region, region abbreviation,
+country and country code to pick between same-named places; ties go to the
+most populous place. Prefix and misspelling matches are only used when a
+qualifier confirms them and they come down to a single name; otherwise the
+closest place is offered as a suggestion instead of silently being used.
+
+The bundled data is every GeoNames place with a population of at least
+15,000 (see build_gazetteer.py), so smaller towns need explicit coordinates.
+"""
+
+import bisect
+import csv
+import re
+import sys
+import unicodedata
+from array import array
+from collections import Counter, defaultdict
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from config import config
+
+# Minimum trigram similarity for a fuzzy match to be accepted
+MIN_SIMILARITY = 0.5
+
+# Fuzzy matches are for misspellings, so their length must be close to the
+# query's (otherwise "Port Melbourne" would match "Melbourne")
+MAX_LENGTH_DIFFERENCE = 2
+
+# Trigram postings a fuzzy candidate must appear in before it is scored;
+# higher reads more postings but scores fewer names
+FUZZY_PREFILTER_HITS = 3
+
+# Prefix or misspelling matches spanning more names than this are too
+# ambiguous to narrow down, even with qualifiers
+MAX_INEXACT_NAMES = 20
+
+# Words written either way in place names
+ABBREVIATIONS = {
+    "saint": "st",
+    "sainte": "ste",
+    "mount": "mt",
+}
+
+# Common informal country names, mapped to ISO 3166 country codes
+COUNTRY_ALIASES = {
+    "usa": "us",
+    "u s a": "us",
+    "u s": "us",
+    "america": "us",
+    "united states of america": "us",
+    "uk": "gb",
+    "u k": "gb",
+    "great britain": "gb",
+    "britain": "gb",
+    "holland": "nl",
+    "the netherlands": "nl",
+    "czech republic": "cz",
+    "korea": "kr",
+    "republic of korea": "kr",
+    "uae": "ae",
+}
+
+
+class Place(NamedTuple):
+    name: str
+    admin: str
+    admin_code: str
+    country: str
+    country_code: str
+    latitude: float
+    longitude: float
+    timezone: str
+    population: int
+
+
+_SEPARATORS = re.compile(r"[\W_]+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase, strip accents and punctuation, abbreviate "Saint" etc. and collapse whitespace."""
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(c for c in text if not unicodedata.combining(c))
+    text = _SEPARATORS.sub(" ", text.lower())
+    return " ".join(ABBREVIATIONS.get(word, word) for word in text.split())
+
+
+def trigrams(text: str) -> set:
+    """Character trigrams of a normalised name, padded at both ends."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class Gazetteer:
+    """
+    Compact in-memory index over a list of places.
+
+    Places are stored sorted by normalised name (most populous first within a
+    name), so each distinct name is an integer id into the sorted name list
+    and owns a contiguous slice of places. Trigram postings are arrays of
+    name ids ordered by name length, so a fuzzy lookup only reads the names
+    whose length is close to the query's.
+    """
+
+    def __init__(self, places: List[Place]) -> None:
+        keys = [normalize(place.name) for place in places]
+        order = sorted(range(len(places)), key=lambda i: (keys[i], -places[i].population))
+        self.places: List[Place] = [places[i] for i in order]
+
+        # Sorted distinct names; a name's id is its position. The places of
+        # name id n are self.places[self._starts[n]:self._starts[n + 1]].
+        self._names: List[str] = []
+        self._starts = array("I")
+        for position, i in enumerate(order):
+            if not self._names or self._names[-1] != keys[i]:
+                self._names.append(sys.intern(keys[i]))
+                self._starts.append(position)
+        self._starts.append(len(order))
+
+        self._lengths = array("H", (len(name) for name in self._names))
+        self._gram_counts = array("H", [0]) * len(self._names)
+        postings: Dict[str, List[int]] = defaultdict(list)
+        for name_id in sorted(range(len(self._names)), key=self._lengths.__getitem__):
+            grams = trigrams(self._names[name_id])
+            self._gram_counts[name_id] = len(grams)
+            for gram in grams:
+                postings[gram].append(name_id)
+        self._postings: Dict[str, array] = {
+            sys.intern(gram): array("I", ids) for gram, ids in postings.items()
+        }
+
+        # Per-place strings a qualifier may match. Regions and countries
+        # repeat, so each is normalised once and shared between places.
+        normalized: Dict[str, str] = {}
+        def key(text: str) -> str:
+            if text not in normalized:
+                normalized[text] = normalize(text)
+            return normalized[text]
+
+        self._qualifiers: List[Tuple[str, ...]] = [
+            tuple(
+                k for k in (key(p.admin), key(p.admin_code.lower()), key(p.country), key(p.country_code.lower()))
+                if k
+            )
+            for p in self.places
+        ]
+
+    @classmethod
+    def from_csv(cls, path: str) -> "Gazetteer":
+        """Load a gazetteer from a CSV with a header row matching Place (admin_code may be omitted)."""
+        # Regions, countries and timezones repeat across rows; keep one copy of each
+        strings: Dict[str, str] = {}
+        shared = lambda value: strings.setdefault(value, value)
+        with open(path, newline="", encoding="utf-8") as f:
+            places = [
+                Place(
+                    name=row["name"],
+                    admin=shared(row["admin"]),
+                    admin_code=shared(row.get("admin_code") or ""),
+                    country=shared(row["country"]),
+                    country_code=shared(row["country_code"]),
+                    latitude=float(row["latitude"]),
+                    longitude=float(row["longitude"]),
+                    timezone=shared(row["timezone"]),
+                    population=int(row["population"] or 0),
+                )
+                for row in csv.DictReader(f)
+            ]
+        return cls(places)
+
+    def _exact_id(self, name: str) -> Optional[int]:
+        i = bisect.bisect_left(self._names, name)
+        if i < len(self._names) and self._names[i] == name:
+            return i
+        return None
+
+    def _prefix_ids(self, prefix: str) -> range:
+        return range(
+            bisect.bisect_left(self._names, prefix),
+            bisect.bisect_left(self._names, prefix + "\uffff"),
+        )
+
+    def _closest_ids(self, name: str) -> List[int]:
+        grams = trigrams(name)
+        # A similarity above 0.5 needs more than half of the query's trigrams
+        # in common, so a match appears in at least `hits` of the query's
+        # len(grams) - min_shared + hits rarest postings. Only those are read
+        # (restricted to names of a similar length), and the few names found
+        # often enough are scored exactly.
+        min_shared = len(grams) // 2 + 1
+        hits = min(FUZZY_PREFILTER_HITS, min_shared)
+        length = self._lengths.__getitem__
+        postings = []
+        for gram in grams:
+            ids = self._postings.get(gram, ())
+            postings.append(ids[
+                bisect.bisect_left(ids, len(name) - MAX_LENGTH_DIFFERENCE, key=length):
+                bisect.bisect_right(ids, len(name) + MAX_LENGTH_DIFFERENCE, key=length)
+            ])
+        postings.sort(key=len)
+        seen: Counter = Counter()
+        for ids in postings[:len(grams) - min_shared + hits]:
+            seen.update(ids)
+
+        best_score = MIN_SIMILARITY
+        best: List[int] = []
+        for name_id in [name_id for name_id, count in seen.items() if count >= hits]:
+            shared = len(grams & trigrams(self._names[name_id]))
+            score = shared / (len(grams) + self._gram_counts[name_id] - shared)
+            if score > best_score:
+                best_score, best = score, [name_id]
+            elif score == best_score:
+                best.append(name_id)
+        return best
+
+    def _match(self, query: str) -> Tuple[Optional[Place], bool]:
+        """
+        Returns (best place, whether it can be used without asking). Only an
+        exact name, or a prefix or misspelling narrowed to a single name by
+        a qualifier that matches it, is used; a lone prefix or misspelling
+        ("Bude", "Wells") is as likely to be a place missing from the
+        gazetteer as a typo, so it is only a suggestion.
+        """
+        parts = [normalize(part) for part in query.split(",")]
+        parts = [part for part in parts if part]
+        if not parts:
+            return None, False
+
+        exact_id = self._exact_id(parts[0])
+        if exact_id is not None:
+            name_ids = [exact_id]
+        else:
+            name_ids = self._prefix_ids(parts[0]) or self._closest_ids(parts[0])
+            if not name_ids or len(name_ids) > MAX_INEXACT_NAMES:
+                return None, False
+
+        # (name id, place position) pairs
+        candidates = [
+            (name_id, position)
+            for name_id in name_ids
+            for position in range(self._starts[name_id], self._starts[name_id + 1])
+        ]
+
+        qualifiers = [COUNTRY_ALIASES.get(q, q) for q in parts[1:]]
+        if qualifiers:
+            scores = [
+                sum(q in self._qualifiers[position] for q in qualifiers)
+                for _, position in candidates
+            ]
+            best_score = max(scores)
+            if not best_score:
+                return None, False
+            candidates = [c for c, score in zip(candidates, scores) if score == best_score]
+
+        single_name = len({name_id for name_id, _ in candidates}) == 1
+        best = max((self.places[position] for _, position in candidates), key=lambda p: p.population)
+        if exact_id is not None:
+            return best, True
+        return (best if single_name else None), bool(qualifiers) and single_name
+
+    def resolve(self, query: str) -> Optional[Place]:
+        """Return the matching place for a free-text query, or None if it is unknown or ambiguous."""
+        place, confirmed = self._match(query)
+        return place if confirmed else None
+
+    def suggest(self, query: str) -> Optional[Place]:
+        """Return the place an unresolved query most likely meant (e.g. "Melborne" -> Melbourne), if any."""
+        place, confirmed = self._match(query)
+        return None if confirmed else place
+
+
+@lru_cache(maxsize=None)
+def get_gazetteer() -> Gazetteer:
+    """Load the configured gazetteer once per process."""
+    return Gazetteer.from_csv(config.GAZETTEER_PATH)
+
+
+@lru_cache(maxsize=4096)
+def resolve_place(query: str) -> Optional[Place]:
+    """Resolve a place name to coordinates and timezone using the bundled gazetteer."""
+    return get_gazetteer().resolve(query)
+
+
+def suggest_place(query: str) -> Optional[Place]:
+    """Suggest a place for a query that resolve_place could not resolve."""
+    return get_gazetteer().suggest(query)
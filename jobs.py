@@ -0,0 +1,384 @@
+"""
+Background bulk jobs for computing chart positions.
+
+A job is a directory under config.JOBS_DIR holding:
+    job.json       status and counters
+    input.ndjson   the validated birth records, one per line
+    chunks/        one CSV per completed chunk of records (the checkpoints)
+    results.*      exports built on demand from the chunks
+
+Places are resolved in the workers, so submitting a job only validates its
+records; a record whose place is unknown fails with a message in the error
+column. Chunks are computed in a process pool and each is written atomically
+as it completes, so a restarted server resumes a job from its remaining chunks
+instead of starting over. Results have one row per subject-object.
+"""
+
+import csv
+import json
+import multiprocessing
+import os
+import queue
+import re
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Optional, Tuple
+
+import swisseph as swe
+from immanuel import charts
+from immanuel.const import calc, chart, names
+from immanuel.setup import settings
+from immanuel.tools import ephemeris, position
+
+from birth_records import record_location
+from compact import RawNatal
+from config import config
+
+COLUMNS = ("subject", "object", "name", "longitude", "speed", "sign", "house", "retrograde", "error")
+
+# Export format -> (file extension, media type)
+FORMATS = {
+    "csv": ("csv", "text/csv"),
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+    "arrow": ("arrow", "application/vnd.apache.arrow.file"),
+}
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETE = "complete"
+FAILED = "failed"
+
+_queue: "queue.Queue[str]" = queue.Queue()
+_dispatcher: Optional[threading.Thread] = None
+_pool: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+_stopping = threading.Event()
+
+
+def _job_path(job_id: str, *parts: str) -> str:
+    return os.path.join(config.JOBS_DIR, job_id, *parts)
+
+
+def _chunk_path(job_id: str, number: int) -> str:
+    return _job_path(job_id, "chunks", f"{number:06d}.csv")
+
+
+def _temp_path(path: str) -> str:
+    """Returns a new, uniquely named temporary sibling of path."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    os.close(fd)
+    return tmp
+
+
+def _write_atomic(path: str, write) -> None:
+    """
+    Writes a file via a temporary sibling so readers never see it half-written.
+    Concurrent writers of the same path each use their own temporary file.
+    """
+    tmp = _temp_path(path)
+    try:
+        with open(tmp, "w", newline="", encoding="utf-8") as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def _read_state(job_id: str) -> Optional[dict]:
+    if not re.fullmatch(r"[0-9a-f]{32}", job_id):
+        return None
+    try:
+        with open(_job_path(job_id, "job.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+
+def _write_state(state: dict) -> None:
+    _write_atomic(_job_path(state["id"], "job.json"), lambda f: json.dump(state, f))
+
+
+def _house_number(lon: float, houses: dict) -> int:
+    # Same rule as immanuel's position.house, without its unbounded memo cache
+    for house in houses.values():
+        if 0 <= swe.difdeg2n(lon, house["lon"]) < swe.difdeg2n(house["lon"] + house["size"], house["lon"]):
+            return house["number"]
+
+
+def _init_worker(objects: list) -> None:
+    settings.objects = objects
+    # swisseph's ephemeris path is per thread, and the pool is started from
+    # the dispatcher thread rather than the main thread immanuel configured
+    settings.set_swe_filepath()
+    # Bulk work only gets the CPU the API's request handling leaves spare
+    if hasattr(os, "nice"):
+        os.nice(config.JOB_WORKER_NICE)
+
+
+def compute_chunk(records: List[dict]) -> Tuple[list, int]:
+    """Computes result rows for a chunk of records. Returns (rows, failures)."""
+    rows, failures = [], 0
+
+    for record in records:
+        try:
+            latitude, longitude, timezone = record_location(record)
+            settings.house_system = record["house_system"]
+            natal = RawNatal(charts.Subject(
+                date_time=record["date_time"],
+                latitude=latitude,
+                longitude=longitude,
+                timezone=timezone
+            ))
+            for object in natal._objects.values():
+                retrograde = (
+                    object["type"] not in (chart.HOUSE, chart.ANGLE, chart.FIXED_STAR)
+                    and ephemeris.object_movement(object) == calc.RETROGRADE
+                )
+                rows.append((
+                    record["subject"],
+                    object["index"],
+                    object["name"],
+                    object["lon"],
+                    object["speed"],
+                    names.SIGNS[position.sign(object)],
+                    _house_number(object["lon"], natal._houses),
+                    retrograde,
+                    "",
+                ))
+        except Exception as e:
+            failures += 1
+            rows.append((record["subject"], "", "", "", "", "", "", "", str(e)))
+
+    return rows, failures
+
+
+def _count_failures(job_id: str, chunk_count: int) -> int:
+    failures = 0
+    for number in range(chunk_count):
+        path = _chunk_path(job_id, number)
+        if os.path.exists(path):
+            with open(path, newline="", encoding="utf-8") as f:
+                failures += sum(1 for row in csv.DictReader(f) if row["error"])
+    return failures
+
+
+def _first_error(job_id: str) -> str:
+    with open(_chunk_path(job_id, 0), newline="", encoding="utf-8") as f:
+        return next(csv.DictReader(f))["error"]
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # Forking the threaded server (here, from the dispatcher thread) can copy
+        # locks held by other threads into the child, so start workers fresh
+        _pool = ProcessPoolExecutor(
+            max_workers=config.JOB_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(list(settings.objects),),
+        )
+    return _pool
+
+
+def _run(job_id: str) -> None:
+    state = _read_state(job_id)
+    if state is None or state["status"] in (COMPLETE, FAILED):
+        return
+
+    with open(_job_path(job_id, "input.ndjson"), encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+
+    chunk_size = state["chunk_size"]
+    chunk_count = -(-len(records) // chunk_size)
+    pending = [n for n in range(chunk_count) if not os.path.exists(_chunk_path(job_id, n))]
+
+    state["status"] = RUNNING
+    # Recount on every (re)start so a crash between checkpoint and state write is harmless
+    state["failed"] = _count_failures(job_id, chunk_count)
+    _write_state(state)
+
+    pool = _get_pool()
+    futures = {
+        pool.submit(compute_chunk, records[n * chunk_size:(n + 1) * chunk_size]): n
+        for n in pending
+    }
+    for future in as_completed(futures):
+        if _stopping.is_set():
+            return
+        rows, failures = future.result()
+
+        def write(f, rows=rows):
+            writer = csv.writer(f)
+            writer.writerow(COLUMNS)
+            writer.writerows(rows)
+
+        _write_atomic(_chunk_path(job_id, futures[future]), write)
+        state["failed"] += failures
+        _write_state(state)
+
+    if state["total"] and state["failed"] == state["total"]:
+        state["status"] = FAILED
+        state["error"] = f"All {state['total']} records failed, e.g.: {_first_error(job_id)}"
+    else:
+        state["status"] = COMPLETE
+    state["finished_at"] = time.time()
+    _write_state(state)
+
+
+def _dispatch() -> None:
+    while True:
+        job_id = _queue.get()
+        try:
+            _run(job_id)
+        except Exception as e:
+            # Interrupted by shutdown: leave the job running so resume() picks it up
+            if _stopping.is_set():
+                continue
+            state = _read_state(job_id)
+            if state is not None:
+                state["status"] = FAILED
+                state["error"] = str(e)
+                _write_state(state)
+
+
+def _enqueue(job_id: str) -> None:
+    global _dispatcher
+    with _lock:
+        if _dispatcher is None:
+            _dispatcher = threading.Thread(target=_dispatch, name="job-dispatcher", daemon=True)
+            _dispatcher.start()
+    _queue.put(job_id)
+
+
+def submit(records: List[dict]) -> str:
+    """
+    Stores and queues a job. Each record needs subject, date_time, place,
+    latitude and longitude (both None to resolve the place), timezone (or
+    None) and house_system (an immanuel constant), as from birth_record().
+    """
+    job_id = uuid.uuid4().hex
+    os.makedirs(_job_path(job_id, "chunks"))
+
+    def write(f):
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+    _write_atomic(_job_path(job_id, "input.ndjson"), write)
+    _write_state({
+        "id": job_id,
+        "status": QUEUED,
+        "total": len(records),
+        "chunk_size": config.JOB_CHUNK_SIZE,
+        "failed": 0,
+        "created_at": time.time(),
+        "finished_at": None,
+        "error": None,
+    })
+    _enqueue(job_id)
+    return job_id
+
+
+def status(job_id: str) -> Optional[dict]:
+    """Returns the job's state with progress counters, or None if it does not exist."""
+    state = _read_state(job_id)
+    if state is None:
+        return None
+
+    chunks = os.listdir(_job_path(job_id, "chunks"))
+    completed = sum(1 for name in chunks if name.endswith(".csv"))
+    processed = min(state["total"], completed * state["chunk_size"])
+    return state | {
+        "processed": processed,
+        "progress": processed / state["total"] if state["total"] else 1.0,
+    }
+
+
+def resume() -> None:
+    """Re-queues every job that was queued or running when the server stopped."""
+    _stopping.clear()
+    if not os.path.isdir(config.JOBS_DIR):
+        return
+    for job_id in sorted(os.listdir(config.JOBS_DIR)):
+        state = _read_state(job_id)
+        if state is not None and state["status"] in (QUEUED, RUNNING):
+            _enqueue(job_id)
+
+
+def shutdown() -> None:
+    """Stops the worker pool; unfinished chunks are picked up again by resume()."""
+    global _pool
+    _stopping.set()
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _chunk_paths(job_id: str) -> List[str]:
+    chunks_dir = _job_path(job_id, "chunks")
+    return [
+        os.path.join(chunks_dir, name)
+        for name in sorted(os.listdir(chunks_dir))
+        if name.endswith(".csv")
+    ]
+
+
+def export(job_id: str, format: str) -> str:
+    """Builds (once) and returns the path of a complete job's results in the given format."""
+    extension = FORMATS[format][0]
+    path = _job_path(job_id, f"results.{extension}")
+    if os.path.exists(path):
+        return path
+
+    if format == "csv":
+        def write(f):
+            f.write(",".join(COLUMNS) + "\r\n")
+            for chunk in _chunk_paths(job_id):
+                with open(chunk, newline="", encoding="utf-8") as c:
+                    next(c)
+                    for line in c:
+                        f.write(line)
+
+        _write_atomic(path, write)
+        return path
+
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("subject", pa.string()),
+        ("object", pa.int64()),
+        ("name", pa.string()),
+        ("longitude", pa.float64()),
+        ("speed", pa.float64()),
+        ("sign", pa.string()),
+        ("house", pa.int64()),
+        ("retrograde", pa.bool_()),
+        ("error", pa.string()),
+    ])
+    convert_options = pa_csv.ConvertOptions(
+        column_types=schema,
+        strings_can_be_null=True,
+        quoted_strings_can_be_null=False,
+    )
+
+    tmp = _temp_path(path)
+    try:
+        if format == "parquet":
+            writer = pq.ParquetWriter(tmp, schema)
+        else:
+            writer = pa_ipc.new_file(tmp, schema)
+        with writer:
+            for chunk in _chunk_paths(job_id):
+                writer.write_table(pa_csv.read_csv(chunk, convert_options=convert_options))
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+    return path
@@ -1,17 +1,29 @@
-from fastapi import FastAPI, HTTPException, Depends, Header
+from fastapi import FastAPI, HTTPException, Depends, Header, Request
+from fastapi.responses import FileResponse
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from immanuel import charts
 from immanuel.classes.serialize import ToJSON
+import csv
 import datetime
+import io
 import json
+import math
 import os
-from typing import Optional
+from typing import Dict, Optional
 from immanuel.setup import settings
 from immanuel.const import chart
 
 # Import configuration
 from config import config
+import chart_settings  # applies the chart objects and default house system
+from gazetteer import get_gazetteer
+from birth_records import BirthData, birth_record, house_system_map, resolve_location, resolved_place
+from chart_cache import get_natal
+import relationship
+import jobs
+from admission import ApiKey, RateLimited, admission, scheduler
 
 # API Key configuration
 API_KEY = config.API_KEY
@@ -20,45 +32,38 @@ API_KEY_HEADER = "X-API-Key"
 # Security scheme for API key
 security = HTTPBearer(auto_error=False)
 
-import sys
-
 async def verify_api_key(x_api_key: Optional[str] = Header(None, alias="X-API-Key")):
-    """Verify the API key from the X-API-Key header."""
-    print(f"[DEBUG] Received X-API-Key: '{x_api_key}'", file=sys.stderr)
-    print(f"[DEBUG] Expected API_KEY: '{API_KEY}'", file=sys.stderr)
+    """
+    Verify the API key from the X-API-Key header and admit the request under
+    that key's rate limit and concurrency cap.
+    """
     if not x_api_key:
         raise HTTPException(
             status_code=401, 
             detail="API key required. Please provide X-API-Key header."
         )
     
-    if x_api_key != API_KEY:
-        print("[DEBUG] API key mismatch!", file=sys.stderr)
+    api_key = admission.keys.get(x_api_key)
+    if api_key is None:
         raise HTTPException(
             status_code=403, 
             detail="Invalid API key."
         )
+
+    try:
+        admission.acquire(x_api_key)
+    except RateLimited as e:
+        raise HTTPException(
+            status_code=429,
+            detail=e.detail,
+            headers={"Retry-After": str(math.ceil(e.retry_after))}
+        )
     
-    print("[DEBUG] API key matched!", file=sys.stderr)
-    return x_api_key
+    try:
+        yield api_key
+    finally:
+        admission.release(x_api_key)
     
-# Set the objects to include all required points, including all 12 house cusps
-settings.objects = [
-    chart.SUN, chart.MOON, chart.MERCURY, chart.VENUS, chart.MARS, chart.JUPITER, chart.SATURN,
-    chart.URANUS, chart.NEPTUNE, chart.PLUTO, chart.NORTH_NODE, chart.LILITH, chart.CHIRON,
-    chart.PART_OF_FORTUNE, chart.VERTEX, chart.ASC, chart.MC,
-    chart.HOUSE1, chart.HOUSE2, chart.HOUSE3, chart.HOUSE4, chart.HOUSE5, chart.HOUSE6,
-    chart.HOUSE7, chart.HOUSE8, chart.HOUSE9, chart.HOUSE10, chart.HOUSE11, chart.HOUSE12
-]
-
-# Set whole sign as the default house system
-settings.house_system = chart.WHOLE_SIGN
-
-house_system_map = {
-    "whole_sign": chart.WHOLE_SIGN,
-    "placidus": chart.PLACIDUS,
-}
-
 app = FastAPI(
     title="Astrology API",
     description="An API to generate birth charts and transits using the immanuel package.",
@@ -68,30 +73,14 @@ app = FastAPI(
 @app.get("/", summary="Health Check")
 async def health_check():
     """Health check endpoint for Render deployment."""
-    return {"status": "healthy", "message": "Astrology API is running"}
-
-class BirthData(BaseModel):
-    date: str = Field(...)
-    time: str = Field(...)
-    place: str = Field(...)
-    latitude: float = Field(...)
-    longitude: float = Field(...)
-    house_system: Optional[str] = Field("whole_sign", description="House system to use: 'whole_sign' (default) or 'placidus'")
+    return {"status": "healthy", "message": "Astrology API is running", "queued": scheduler.queued()}
 
-    model_config = {
-        "json_schema_extra": {
-            "examples": [
-                {
-                    "date": "1990-01-01",
-                    "time": "12:00:00",
-                    "place": "New York, USA",
-                    "latitude": 40.7128,
-                    "longitude": -74.0060,
-                    "house_system": "whole_sign"
-                }
-            ]
-        }
-    }
+def location_for(birth_data: BirthData):
+    """Resolves the birth data's coordinates and timezone, or raises a 422."""
+    try:
+        return resolve_location(birth_data)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
 
 class TransitData(BaseModel):
     natal_date: str = Field(...)
@@ -116,59 +105,259 @@ class TransitData(BaseModel):
         }
     }
 
+class RelationshipData(BaseModel):
+    native: BirthData = Field(...)
+    partner: BirthData = Field(...)
+    house_system: Optional[str] = Field("whole_sign", description="House system used for both charts: 'whole_sign' (default) or 'placidus'")
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "native": {
+                        "date": "1990-01-01",
+                        "time": "12:00:00",
+                        "place": "New York, USA"
+                    },
+                    "partner": {
+                        "date": "1991-12-10",
+                        "time": "04:59:00",
+                        "place": "Melbourne, Australia"
+                    },
+                    "house_system": "whole_sign"
+                }
+            ]
+        }
+    }
+
+class SynastryData(RelationshipData):
+    orbs: Optional[Dict[str, float]] = Field(None, description="Orb in degrees per aspect name, e.g. {'trine': 6}. Unlisted aspects use the default orbs.")
+
+    @field_validator("orbs")
+    @classmethod
+    def validate_orbs(cls, orbs):
+        if orbs:
+            unknown = [name for name in orbs if name.lower() not in relationship.ASPECT_NAMES]
+            if unknown:
+                raise ValueError(
+                    f"Unknown aspect(s) {unknown}. Valid aspects: {sorted(relationship.ASPECT_NAMES)}"
+                )
+            negative = [name for name, orb in orbs.items() if orb < 0]
+            if negative:
+                raise ValueError(f"Orbs must not be negative: {negative}")
+        return orbs
+
+def natal_for(birth_data: BirthData, house_system: int):
+    """Returns the raw (cached) natal chart for one subject of a relationship request."""
+    latitude, longitude, timezone = location_for(birth_data)
+    dob = f"{birth_data.date} {birth_data.time}"
+    return get_natal(dob, latitude, longitude, timezone, house_system, wrapped=False)
+
+def resolved_places(relationship_data: RelationshipData):
+    return {
+        "native": resolved_place(relationship_data.native),
+        "partner": resolved_place(relationship_data.partner),
+    }
+
 @app.post("/birth-chart", summary="Generate a Birth Chart")
-async def generate_birth_chart(birth_data: BirthData, api_key: str = Depends(verify_api_key)):
+async def generate_birth_chart(birth_data: BirthData, api_key: ApiKey = Depends(verify_api_key)):
     """
     Generates a natal (birth) chart based on the provided date, time, and location.
+    If latitude and longitude are omitted, they are resolved from the place name,
+    and the place used is returned as "resolved_place" (null otherwise).
     """
-    try:
-        # Set house system for this request
-        settings.house_system = house_system_map.get(
-            (birth_data.house_system or "whole_sign").lower(), chart.WHOLE_SIGN
-        )
-        dob = f"{birth_data.date} {birth_data.time}"
-        subject = charts.Subject(
-            date_time=dob,
-            latitude=birth_data.latitude,
-            longitude=birth_data.longitude
-        )
-        natal_chart = charts.Natal(subject)
-        return json.loads(ToJSON().encode(natal_chart))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    def compute():
+        try:
+            latitude, longitude, timezone = location_for(birth_data)
+            # Set house system for this request
+            settings.house_system = house_system_map.get(
+                (birth_data.house_system or "whole_sign").lower(), chart.WHOLE_SIGN
+            )
+            dob = f"{birth_data.date} {birth_data.time}"
+            natal_chart = get_natal(dob, latitude, longitude, timezone, settings.house_system)
+            result = json.loads(ToJSON().encode(natal_chart))
+            result["resolved_place"] = resolved_place(birth_data)
+            return result
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    return await scheduler.run(api_key.priority, compute)
 
 @app.post("/transits", summary="Calculate Transits for a Given Date")
-async def get_transits(transit_data: TransitData, api_key: str = Depends(verify_api_key)):
+async def get_transits(transit_data: TransitData, api_key: ApiKey = Depends(verify_api_key)):
     """
     Calculates the transiting planets for a given date relative to a natal chart.
     """
-    try:
-        # Set house system for this request
-        settings.house_system = house_system_map.get(
-            (transit_data.house_system or "whole_sign").lower(), chart.WHOLE_SIGN
-        )
-        natal_dob = f"{transit_data.natal_date} {transit_data.natal_time}"
-        natal_subject = charts.Subject(
-            date_time=natal_dob,
-            latitude=transit_data.natal_latitude,
-            longitude=transit_data.natal_longitude
-        )
-        natal_chart = charts.Natal(natal_subject)
+    def compute():
+        try:
+            # Set house system for this request
+            settings.house_system = house_system_map.get(
+                (transit_data.house_system or "whole_sign").lower(), chart.WHOLE_SIGN
+            )
+            natal_dob = f"{transit_data.natal_date} {transit_data.natal_time}"
+            natal_chart = get_natal(
+                natal_dob,
+                transit_data.natal_latitude,
+                transit_data.natal_longitude,
+                None,
+                settings.house_system,
+                wrapped=False
+            )
 
-        transit_subject = charts.Subject(
-            date_time=f"{transit_data.transit_date} 00:00:00",
-            latitude=transit_data.natal_latitude,
-            longitude=transit_data.natal_longitude
-        )
-        transit_chart = charts.Transits(
-            latitude=transit_data.natal_latitude,
-            longitude=transit_data.natal_longitude,
-            aspects_to=natal_chart
+            transit_subject = charts.Subject(
+                date_time=f"{transit_data.transit_date} 00:00:00",
+                latitude=transit_data.natal_latitude,
+                longitude=transit_data.natal_longitude
+            )
+            transit_chart = charts.Transits(
+                latitude=transit_data.natal_latitude,
+                longitude=transit_data.natal_longitude,
+                aspects_to=natal_chart
+            )
+
+            return json.loads(ToJSON().encode(transit_chart))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    return await scheduler.run(api_key.priority, compute)
+
+@app.post("/synastry", summary="Calculate Cross-Aspects Between Two Charts")
+async def get_synastry(synastry_data: SynastryData, api_key: ApiKey = Depends(verify_api_key)):
+    """
+    Calculates the aspects between two people's natal charts and where each
+    person's objects fall in the other's houses. Only the inter-chart results
+    are returned, not the two natal charts themselves, plus any places
+    resolved from names as "resolved_places".
+    """
+    house_system = house_system_map.get(
+        (synastry_data.house_system or "whole_sign").lower(), chart.WHOLE_SIGN
+    )
+
+    def compute():
+        try:
+            native_chart = natal_for(synastry_data.native, house_system)
+            partner_chart = natal_for(synastry_data.partner, house_system)
+            result = relationship.synastry(native_chart, partner_chart, synastry_data.orbs)
+            result = json.loads(ToJSON().encode(result))
+            result["resolved_places"] = resolved_places(synastry_data)
+            return result
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    return await scheduler.run(api_key.priority, compute)
+
+@app.post("/composite", summary="Generate a Composite Chart")
+async def get_composite(composite_data: RelationshipData, api_key: ApiKey = Depends(verify_api_key)):
+    """
+    Generates the composite (midpoint) chart of two people's natal charts,
+    plus any places resolved from names as "resolved_places".
+    """
+    house_system = house_system_map.get(
+        (composite_data.house_system or "whole_sign").lower(), chart.WHOLE_SIGN
+    )
+
+    def compute():
+        try:
+            native_chart = natal_for(composite_data.native, house_system)
+            partner_chart = natal_for(composite_data.partner, house_system)
+            settings.house_system = house_system
+            composite_chart = relationship.composite(native_chart, partner_chart)
+            result = json.loads(ToJSON().encode(composite_chart))
+            result["resolved_places"] = resolved_places(composite_data)
+            return result
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    return await scheduler.run(api_key.priority, compute)
+
+@app.on_event("startup")
+async def load_gazetteer():
+    """Build the place-name index up front so the first request doesn't pay for it."""
+    await run_in_threadpool(get_gazetteer)
+
+@app.on_event("startup")
+async def resume_jobs():
+    """Resume any bulk jobs that were interrupted by a restart."""
+    jobs.resume()
+
+@app.on_event("shutdown")
+async def stop_jobs():
+    jobs.shutdown()
+
+@app.post("/jobs", summary="Submit a Bulk Positions Job", status_code=202)
+async def submit_job(request: Request, api_key: ApiKey = Depends(verify_api_key)):
+    """
+    Submits BirthData records for background processing. Send the records as
+    CSV (Content-Type: text/csv) with a header row, or as NDJSON
+    (Content-Type: application/x-ndjson) with one JSON object per line.
+    An optional "id" field labels each subject in the results; otherwise the
+    record number is used. Malformed records reject the whole upload with a
+    422; places that cannot be resolved are reported per record in the
+    results' error column. Returns a job id to poll with GET /jobs/{job_id}.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type not in ("text/csv", "application/x-ndjson", "application/ndjson", "application/jsonl"):
+        raise HTTPException(
+            status_code=415,
+            detail="Send records as text/csv or application/x-ndjson."
         )
+    body = await request.body()
+
+    def parse_records():
+        text = body.decode("utf-8")
+        if content_type == "text/csv":
+            rows = csv.DictReader(io.StringIO(text))
+        else:
+            rows = (line for line in text.splitlines() if line.strip())
+        try:
+            # Places are resolved by the job's workers; unknown ones fail per record
+            return [birth_record(row, number, resolve=False) for number, row in enumerate(rows, 1)]
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+
+    # Validating large uploads would otherwise block the event loop
+    records = await run_in_threadpool(parse_records)
+
+    if not records:
+        raise HTTPException(status_code=422, detail="No records submitted.")
+
+    job_id = await run_in_threadpool(jobs.submit, records)
+    return {"job_id": job_id, "total": len(records)}
+
+@app.get("/jobs/{job_id}", summary="Get Bulk Job Progress")
+async def get_job(job_id: str, api_key: ApiKey = Depends(verify_api_key)):
+    """
+    Returns the job's status (queued, running, complete or failed) and progress.
+    """
+    state = jobs.status(job_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return state
+
+@app.get("/jobs/{job_id}/results", summary="Download Bulk Job Results")
+async def get_job_results(job_id: str, format: str = "csv", api_key: ApiKey = Depends(verify_api_key)):
+    """
+    Downloads a complete job's results with one row per subject-object:
+    subject, object, name, longitude, speed, sign, house, retrograde, error.
+    Formats: csv (default), parquet or arrow.
+    """
+    if format not in jobs.FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown format. Use one of: {', '.join(jobs.FORMATS)}")
+    state = jobs.status(job_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    if state["status"] != jobs.COMPLETE:
+        raise HTTPException(status_code=409, detail=f"Job is {state['status']}.")
 
-        return json.loads(ToJSON().encode(transit_chart))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    path = await run_in_threadpool(jobs.export, job_id, format)
+    extension, media_type = jobs.FORMATS[format]
+    return FileResponse(path, media_type=media_type, filename=f"{job_id}.{extension}")
 
 # To run this application locally:
 # uvicorn main:app --reload --port 8001
@@ -12,6 +12,8 @@ import os
 from datetime import datetime
 from dotenv import load_dotenv
 
+from chart_display import PLANET_EMOJI, format_degree
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -40,12 +42,7 @@ def format_sign_degree(longitude, sign):
     deg_in_sign = longitude - sign_start
     if deg_in_sign < 0:
         deg_in_sign += 30
-    degrees = int(deg_in_sign)
-    minutes = int(round((deg_in_sign - degrees) * 60))
-    if minutes == 60:
-        degrees += 1
-        minutes = 0
-    return f"{degrees}°{minutes:02d}'"
+    return format_degree(deg_in_sign)
 
 def generate_birth_chart():
     """Generate and display the birth chart"""
@@ -111,16 +108,7 @@ def generate_birth_chart():
                 retrograde = longitude.get('retrograde', False)
                 degree = format_sign_degree(raw_long, sign)
                 
-                # Add emoji for planets
-                planet_emoji = {
-                    "Sun": "☀️", "Moon": "🌙", "Mercury": "☿", "Venus": "♀️", 
-                    "Mars": "♂️", "Jupiter": "♃", "Saturn": "♄", "Uranus": "♅", 
-                    "Neptune": "♆", "Pluto": "♇", "North Node": "☊", 
-                    "Lilith": "⚸", "Chiron": "⚷", "Part of Fortune": "⚸",
-                    "Vertex": "⚸", "Asc": "🔼", "MC": "🔽"
-                }
-                
-                emoji = planet_emoji.get(planet_name, "•")
+                emoji = PLANET_EMOJI.get(planet_name, "•")
                 retrograde_symbol = " ℞" if retrograde else ""
                 print(f"{emoji} {planet_name:15} {sign:12} {degree}{retrograde_symbol}")
         
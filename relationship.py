@@ -0,0 +1,153 @@
+"""
+Inter-chart calculations for relationship readings.
+
+Everything here works from already-computed charts.Natal instances (see
+chart_cache), so neither partner's ephemeris data is recalculated.
+"""
+
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from immanuel import charts
+from immanuel.classes import wrap
+from immanuel.const import chart, names
+from immanuel.reports import aspect
+from immanuel.setup import settings
+from immanuel.tools import ephemeris, midpoint, position
+
+# Lowercase aspect name -> immanuel aspect constant, for aspects enabled in settings
+ASPECT_NAMES = {names.ASPECTS[a].lower(): a for a in settings.aspects}
+
+
+@contextmanager
+def orb_overrides(orbs: Optional[Dict[str, float]]):
+    """
+    Temporarily applies per-aspect orbs (keyed by aspect name, e.g.
+    {"trine": 6}) to every configured chart object.
+    """
+    if not orbs:
+        yield
+        return
+
+    overrides = {ASPECT_NAMES[name.lower()]: orb for name, orb in orbs.items()}
+    previous = settings._orbs
+    current = settings.orbs
+    settings.orbs = {
+        index: (current.get(index) or dict.fromkeys(names.ASPECTS, settings.default_orb)) | overrides
+        for index in settings.objects
+    }
+    try:
+        yield
+    finally:
+        settings.orbs = previous
+
+
+def _aspect_names(native_object: dict, partner_object: dict) -> tuple:
+    """
+    Returns the (active, passive) names for an aspect between a native and a
+    partner object. Both charts use the same indices, so the names are taken
+    from the objects themselves; like aspect.between, the faster object is active.
+    """
+    if abs(native_object["speed"]) > abs(partner_object["speed"]):
+        return native_object["name"], partner_object["name"]
+    return partner_object["name"], native_object["name"]
+
+
+def synastry(native: charts.Natal, partner: charts.Natal, orbs: Optional[Dict[str, float]] = None) -> dict:
+    """
+    Returns the cross-aspects between two natal charts, keyed by native object
+    then partner object, plus each chart's objects placed in the other's houses.
+    """
+    with orb_overrides(orbs):
+        aspects = aspect.synastry(native._objects, partner._objects)
+
+    return {
+        "aspects": {
+            index: {
+                partner_index: wrap.Aspect(
+                    object_aspect,
+                    *_aspect_names(native._objects[index], partner._objects[partner_index]),
+                )
+                for partner_index, object_aspect in aspect_list.items()
+            }
+            for index, aspect_list in aspects.items()
+        },
+        "house_overlays": {
+            "native_in_partner": {
+                index: position.house(object, partner._houses)["number"]
+                for index, object in native._objects.items()
+            },
+            "partner_in_native": {
+                index: position.house(object, native._houses)["number"]
+                for index, object in partner._objects.items()
+            },
+        },
+    }
+
+
+class NatalComposite(charts.Composite):
+    """Composite chart built from the midpoints of two computed natal charts,
+    reusing their objects and houses instead of recalculating them."""
+
+    def __init__(self, native_chart: charts.Natal, partner_chart: charts.Natal) -> None:
+        self._native_chart = native_chart
+        self._partner_chart = partner_chart
+        super().__init__(native_chart._native, partner_chart._native)
+
+    def generate(self) -> None:
+        native, partner = self._native_chart, self._partner_chart
+
+        self._obliquity = midpoint.obliquity(
+            self._native.julian_date, self._partner.julian_date
+        )
+        self._objects = midpoint.all(
+            objects1=native._objects,
+            objects2=partner._objects,
+            obliquity=self._obliquity,
+        )
+
+        if settings.house_system == chart.WHOLE_SIGN:
+            native_armc = ephemeris.get_angle(
+                index=chart.ARMC,
+                jd=self._native.julian_date,
+                lat=self._native.latitude,
+                lon=self._native.longitude,
+                house_system=settings.house_system,
+            )
+            partner_armc = ephemeris.get_angle(
+                index=chart.ARMC,
+                jd=self._partner.julian_date,
+                lat=self._partner.latitude,
+                lon=self._partner.longitude,
+                house_system=settings.house_system,
+            )
+            armc = midpoint.composite(native_armc, partner_armc, self._obliquity)["lon"]
+            self._houses = ephemeris.get_armc_houses(
+                armc=armc,
+                lat=(self._native.latitude + self._partner.latitude) / 2,
+                obliquity=self._obliquity,
+                house_system=settings.house_system,
+            )
+        else:
+            self._houses = midpoint.all(
+                objects1=native._houses,
+                objects2=partner._houses,
+                obliquity=self._obliquity,
+            )
+
+        for index in (chart.SUN, chart.MOON, chart.ASC):
+            self._triad[index] = self._objects.get(index) or midpoint.composite(
+                native._triad[index], partner._triad[index], self._obliquity
+            )
+
+        self._diurnal = ephemeris.is_daytime_from(
+            self._triad[chart.SUN], self._triad[chart.ASC]
+        )
+        self._moon_phase = ephemeris.moon_phase_from(
+            self._triad[chart.SUN], self._triad[chart.MOON]
+        )
+
+
+def composite(native: charts.Natal, partner: charts.Natal) -> charts.Composite:
+    """Returns the composite (midpoint) chart of two natal charts."""
+    return NatalComposite(native, partner)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Test script for per-API-key admission control and priority lanes.
+Runs in-process - no server required.
+"""
+
+import asyncio
+import contextlib
+import io
+import time
+
+from fastapi.testclient import TestClient
+from immanuel import charts
+
+import main
+from admission import Admission, ApiKey, ChartScheduler, RateLimited, TokenBucket, load_api_keys
+from config import config
+
+def test_token_bucket():
+    """Test that a bucket allows its burst, then refills at its rate."""
+    bucket = TokenBucket(rate=10, burst=2)
+    assert bucket.take() == 0 and bucket.take() == 0
+    wait = bucket.take()
+    assert 0 < wait <= 0.1
+    time.sleep(wait)
+    assert bucket.take() == 0
+    print("✅ Token bucket enforces burst and refill rate")
+
+def test_concurrency_cap():
+    """Test that a key cannot exceed its in-flight request cap."""
+    admission = Admission({"k": ApiKey(name="k", max_concurrency=1)})
+    admission.acquire("k")
+    try:
+        admission.acquire("k")
+        assert False, "second request should be rejected"
+    except RateLimited:
+        pass
+    admission.release("k")
+    admission.acquire("k")
+    print("✅ Concurrency cap rejects excess in-flight requests")
+
+def test_interactive_runs_first():
+    """Test that queued interactive work runs before queued bulk work."""
+    order = []
+
+    async def run():
+        scheduler = ChartScheduler()
+        blocker = scheduler.run("bulk", lambda: time.sleep(0.1))
+        await asyncio.sleep(0)
+        tasks = [asyncio.ensure_future(blocker)]
+        tasks += [asyncio.ensure_future(scheduler.run("bulk", lambda i=i: order.append(f"bulk{i}"))) for i in range(3)]
+        await asyncio.sleep(0.02)
+        tasks.append(asyncio.ensure_future(scheduler.run("interactive", lambda: order.append("interactive"))))
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+    assert order == ["interactive", "bulk0", "bulk1", "bulk2"], order
+    print(f"✅ Priority order: {order}")
+
+def test_real_chart_on_scheduler():
+    """Test that the scheduler thread can compute real charts (it needs its own ephemeris path)."""
+    async def run():
+        scheduler = ChartScheduler()
+        return await scheduler.run("interactive", lambda: charts.Natal(
+            charts.Subject("1991-12-10 04:59:00", -37.8136, 144.9631)
+        ))
+
+    natal = asyncio.run(run())
+    assert natal.objects[main.chart.SUN].sign.name == "Sagittarius"
+    print("✅ Scheduler thread computes real charts")
+
+def test_legacy_api_key():
+    """Test that the legacy API_KEY only bypasses API_KEYS limits when set explicitly."""
+    saved = (config.API_KEY, config.API_KEY_SET, config.API_KEYS)
+    limited = '{"web-key": {"name": "web", "rate": 5}}'
+    try:
+        # Single-key setup: the default key is kept, as before
+        config.API_KEY, config.API_KEY_SET, config.API_KEYS = config.PLACEHOLDER_API_KEY, False, ""
+        assert list(load_api_keys()) == [config.PLACEHOLDER_API_KEY]
+
+        # API_KEYS set and API_KEY not: only the configured keys are accepted
+        config.API_KEYS = limited
+        assert list(load_api_keys()) == ["web-key"]
+
+        config.API_KEY, config.API_KEY_SET = "real-key", True
+        assert load_api_keys()["real-key"].rate is None
+
+        # The placeholder copied from env.example is refused
+        config.API_KEY = config.PLACEHOLDER_API_KEY
+        try:
+            load_api_keys()
+            raise AssertionError("placeholder API_KEY accepted alongside API_KEYS")
+        except ValueError as e:
+            assert "placeholder" in str(e)
+    finally:
+        config.API_KEY, config.API_KEY_SET, config.API_KEYS = saved
+    print("✅ Placeholder API_KEY is never added alongside API_KEYS")
+
+def test_endpoints():
+    """Test the chart endpoints end to end, and that API keys are never logged."""
+    client = TestClient(main.app)
+    headers = {"X-API-Key": main.config.API_KEY}
+    native = {"date": "1991-12-10", "time": "04:59:00", "place": "Melbourne", "latitude": -37.8136, "longitude": 144.9631}
+    partner = {"date": "1990-01-01", "time": "12:00:00", "place": "New York, NY"}
+
+    stderr = io.StringIO()
+    with contextlib.redirect_stderr(stderr):
+        responses = {
+            "/birth-chart": client.post("/birth-chart", json=native, headers=headers),
+            "/transits": client.post("/transits", json={
+                "natal_date": native["date"], "natal_time": native["time"],
+                "natal_latitude": native["latitude"], "natal_longitude": native["longitude"],
+                "transit_date": "2024-01-01",
+            }, headers=headers),
+            "/synastry": client.post("/synastry", json={"native": native, "partner": partner, "orbs": {"trine": 6}}, headers=headers),
+            "/composite": client.post("/composite", json={"native": native, "partner": partner}, headers=headers),
+        }
+    for path, response in responses.items():
+        assert response.status_code == 200, (path, response.text)
+    assert responses["/birth-chart"].json()["objects"][str(main.chart.SUN)]["sign"]["name"] == "Sagittarius"
+    assert responses["/synastry"].json()["aspects"]
+    assert main.config.API_KEY not in stderr.getvalue()
+    print(f"✅ {', '.join(responses)} return 200 without logging the API key")
+
+if __name__ == "__main__":
+    print("🚦 Testing Admission Control")
+    print("=" * 50)
+    test_token_bucket()
+    test_concurrency_cap()
+    test_interactive_runs_first()
+    test_real_chart_on_scheduler()
+    test_legacy_api_key()
+    test_endpoints()
+    print("=" * 50)
+    print("✅ Admission tests complete!")
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test script for the compact chart representation.
+Runs in-process - no server required.
+"""
+
+import sys
+
+from immanuel import charts
+from immanuel.classes.serialize import ToJSON
+from immanuel.const import chart
+
+import main  # applies the API's chart settings
+import relationship
+from compact import CompactChart
+
+NATIVE = charts.Subject("1991-12-10 04:59:00", -37.8136, 144.9631)
+PARTNER = charts.Subject("1990-01-01 12:00:00", 40.7128, -74.0060)
+
+def deep_sizeof(obj, seen):
+    """Recursive size of an object graph, skipping anything already in seen."""
+    if id(obj) in seen or isinstance(obj, type) or type(obj).__module__ == "zoneinfo":
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(deep_sizeof(v, seen) for v in obj)
+    if hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), seen)
+    for slot in getattr(type(obj), "__slots__", ()):
+        size += deep_sizeof(getattr(obj, slot, None), seen)
+    return size
+
+def test_lossless_round_trip():
+    """Test that natal, transit and composite charts regenerate identical JSON."""
+    for house_system in (chart.WHOLE_SIGN, chart.PLACIDUS):
+        main.settings.house_system = house_system
+        natal = charts.Natal(NATIVE)
+        compact = CompactChart(natal)
+        assert ToJSON().encode(compact.to_chart()) == ToJSON().encode(natal)
+
+        transits = charts.Transits(NATIVE.latitude, NATIVE.longitude, aspects_to=natal)
+        compact_transits = CompactChart(transits, aspects_to=compact)
+        assert ToJSON().encode(compact_transits.to_chart()) == ToJSON().encode(transits)
+
+        composite = relationship.composite(natal, charts.Natal(PARTNER))
+        assert ToJSON().encode(CompactChart(composite).to_chart()) == ToJSON().encode(composite)
+    print("✅ Compact charts regenerate identical JSON")
+
+def test_bytes_per_chart():
+    """Test that a compact chart retains at least 5x fewer bytes."""
+    main.settings.house_system = chart.WHOLE_SIGN
+    natal = charts.Natal(NATIVE)
+    compact = CompactChart(natal)
+    full_bytes = deep_sizeof(natal, set())
+    # The layout is interned and shared by every chart with the same objects
+    compact_bytes = deep_sizeof(compact, {id(compact.layout)})
+    assert full_bytes >= 5 * compact_bytes
+    print(f"✅ {full_bytes} bytes -> {compact_bytes} bytes ({full_bytes / compact_bytes:.0f}x smaller)")
+
+if __name__ == "__main__":
+    print("📦 Testing Compact Charts")
+    print("=" * 50)
+    test_lossless_round_trip()
+    test_bytes_per_chart()
+    print("=" * 50)
+    print("✅ Compact chart tests complete!")
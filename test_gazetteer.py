@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test script for offline place-name resolution.
+Runs in-process against the bundled gazetteer - no server required.
+"""
+
+import time
+import timeit
+import tracemalloc
+
+from config import config
+from gazetteer import Gazetteer, get_gazetteer, resolve_place, suggest_place
+
+def test_exact_match():
+    """Test that a city with country qualifier resolves to the right place."""
+    place = resolve_place("Melbourne, Victoria, Australia")
+    assert place is not None
+    assert place.timezone == "Australia/Melbourne"
+    assert abs(place.latitude - -37.8136) < 0.01
+    print(f"✅ Melbourne, Victoria, Australia -> {place.latitude}, {place.longitude} ({place.timezone})")
+
+def test_qualifier_disambiguation():
+    """Test that qualifiers pick between same-named places."""
+    assert resolve_place("Melbourne").country_code == "AU"
+    assert resolve_place("Melbourne, Florida").country_code == "US"
+    assert resolve_place("Portland, Maine").timezone == "America/New_York"
+    assert resolve_place("London, Ontario").country_code == "CA"
+    assert resolve_place("New York, USA").timezone == "America/New_York"
+    print("✅ Qualifiers disambiguate same-named places")
+
+def test_region_abbreviations():
+    """Test state/province abbreviations and common place-name variants."""
+    assert resolve_place("New York, NY").name == "New York City"
+    assert resolve_place("Los Angeles, CA").timezone == "America/Los_Angeles"
+    assert resolve_place("Victoria, BC").timezone == "America/Vancouver"
+    assert resolve_place("Hamilton, Ontario").country_code == "CA"
+    assert resolve_place("Bristol").country_code == "GB"
+    assert resolve_place("York, PA").admin == "Pennsylvania"
+    assert resolve_place("Saint Louis, MO").name == "St. Louis"
+    assert resolve_place("Port Melbourne").name == "Port Melbourne"
+    print("✅ Region abbreviations and name variants resolve")
+
+def test_prefix_and_fuzzy_match():
+    """Test that prefix and misspelled lookups resolve when a qualifier confirms them."""
+    assert resolve_place("San Fran, CA").name == "San Francisco"
+    assert resolve_place("Melborne, Australia").name == "Melbourne"
+    assert resolve_place("Sao Paolo, Brazil").name == "São Paulo"
+    assert resolve_place("Sao Paulo, Brazil").name == "São Paulo"
+    print("✅ Confirmed prefix, fuzzy and accented lookups resolve")
+
+def test_unconfirmed_partial_matches():
+    """Test that partial or misspelled names are never silently used on their own."""
+    for query in ("Bude", "Wells", "Aspen", "Georgia", "France", "New", "S", "Melborne", "San Fran"):
+        assert resolve_place(query) is None, (query, resolve_place(query))
+    # Too many names to narrow down, even with a qualifier
+    assert resolve_place("New, NY") is None
+    # Unconfirmed single-name matches are offered as suggestions instead
+    assert suggest_place("Melborne").name == "Melbourne"
+    assert suggest_place("Melbourne") is None
+    assert suggest_place("S") is None
+    print("✅ Unconfirmed prefix and fuzzy matches are rejected")
+
+def test_unresolvable():
+    """Test that unknown places and mismatched qualifiers return None."""
+    assert resolve_place("Xyzzyville") is None
+    assert resolve_place("Port Melbourneville") is None
+    assert resolve_place("Melbourne, Japan") is None
+    assert resolve_place("") is None
+    print("✅ Unknown places are rejected")
+
+def test_index_size():
+    """Report the time and memory needed to build the index."""
+    started = time.perf_counter()
+    Gazetteer.from_csv(config.GAZETTEER_PATH)
+    seconds = time.perf_counter() - started
+    # tracemalloc slows the build down, so measure memory on a second one
+    tracemalloc.start()
+    gazetteer = Gazetteer.from_csv(config.GAZETTEER_PATH)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"✅ Indexed {len(gazetteer.places)} places in {seconds:.2f}s, {size / 1e6:.1f} MB")
+
+def test_lookup_latency():
+    """Test that uncached exact, fuzzy and failed lookups stay in the microsecond range."""
+    gazetteer = get_gazetteer()
+    runs = 1000
+    for query in ("Melbourne, Victoria, Australia", "Melborne, Australia", "Byron Bay", "Londn", "Xyzzyville"):
+        micros = timeit.timeit(lambda: gazetteer.resolve(query), number=runs) / runs * 1e6
+        assert micros < 1000, (query, micros)
+        print(f"✅ Uncached lookup of {query!r}: {micros:.1f} µs")
+
+if __name__ == "__main__":
+    print("🌍 Testing Gazetteer")
+    print("=" * 50)
+    test_exact_match()
+    test_qualifier_disambiguation()
+    test_region_abbreviations()
+    test_prefix_and_fuzzy_match()
+    test_unconfirmed_partial_matches()
+    test_unresolvable()
+    test_index_size()
+    test_lookup_latency()
+    print("=" * 50)
+    print("✅ Gazetteer tests complete!")
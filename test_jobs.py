@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Test script for background bulk jobs.
+Runs in-process against a temporary JOBS_DIR - no server required.
+Works as a script or under pytest (setup_module/teardown_module).
+"""
+
+import csv
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pyarrow.ipc as pa_ipc
+import pyarrow.parquet as pq
+from immanuel.const import chart
+
+import main  # applies the API's chart settings
+import jobs
+from config import config
+
+_saved_config = {}
+
+def setup_module(module=None):
+    """Runs jobs in a temporary JOBS_DIR with small chunks and two workers."""
+    _saved_config.update(
+        JOBS_DIR=config.JOBS_DIR, JOB_CHUNK_SIZE=config.JOB_CHUNK_SIZE, JOB_WORKERS=config.JOB_WORKERS
+    )
+    config.JOBS_DIR = tempfile.mkdtemp(prefix="test_jobs_")
+    config.JOB_CHUNK_SIZE = 2
+    config.JOB_WORKERS = 2
+
+def teardown_module(module=None):
+    jobs.shutdown()
+    shutil.rmtree(config.JOBS_DIR, ignore_errors=True)
+    for name, value in _saved_config.items():
+        setattr(config, name, value)
+
+def record(subject, date_time="1991-12-10 04:59:00"):
+    return {
+        "subject": subject,
+        "date_time": date_time,
+        "place": "Melbourne",
+        "latitude": -37.8136,
+        "longitude": 144.9631,
+        "timezone": "Australia/Melbourne",
+        "house_system": chart.WHOLE_SIGN,
+    }
+
+def wait_for(job_id, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        state = jobs.status(job_id)
+        if state["status"] in (jobs.COMPLETE, jobs.FAILED):
+            return state
+        time.sleep(0.2)
+    raise AssertionError(f"Job {job_id} did not finish: {state}")
+
+def test_job_and_exports():
+    """Test that a job computes real positions in worker processes and exports in every format."""
+    job_id = jobs.submit([record("a"), record("b"), record("bad", "not a date"), record("c")])
+    state = wait_for(job_id)
+    assert state["status"] == jobs.COMPLETE, state
+    assert state["failed"] == 1 and state["processed"] == 4
+
+    with open(jobs.export(job_id, "csv"), newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    objects_per_chart = len(main.settings.objects)
+    assert len(rows) == 3 * objects_per_chart + 1
+    errors = [row for row in rows if row["error"]]
+    assert [row["subject"] for row in errors] == ["bad"]
+    sun = next(row for row in rows if row["subject"] == "a" and row["name"] == "Sun")
+    assert sun["sign"] == "Sagittarius" and sun["house"]
+
+    parquet = pq.read_table(jobs.export(job_id, "parquet"))
+    with pa_ipc.open_file(jobs.export(job_id, "arrow")) as reader:
+        arrow = reader.read_all()
+    assert parquet.num_rows == arrow.num_rows == len(rows)
+    assert parquet.equals(arrow)
+    print(f"✅ Job of 4 records -> {len(rows)} rows (1 failed), exported as csv, parquet and arrow")
+
+def test_all_records_failed():
+    """Test that a job where every record fails is marked failed."""
+    job_id = jobs.submit([record("x", "not a date"), record("y", "also not a date")])
+    state = wait_for(job_id)
+    assert state["status"] == jobs.FAILED, state
+    assert state["failed"] == 2 and "All 2 records failed" in state["error"]
+    print(f"✅ All-failed job is marked failed: {state['error']}")
+
+def test_places_resolved_by_workers():
+    """Test that places are resolved in the job, with unknown places failing per record."""
+    unresolved = [
+        record("melbourne") | {"place": "Melbourne, VIC", "latitude": None, "longitude": None, "timezone": None},
+        record("nowhere") | {"place": "Xyzzyville", "latitude": None, "longitude": None, "timezone": None},
+    ]
+    job_id = jobs.submit(unresolved + [record("coordinates")])
+    state = wait_for(job_id)
+    assert state["status"] == jobs.COMPLETE and state["failed"] == 1, state
+
+    with open(jobs.export(job_id, "csv"), newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    errors = {row["subject"]: row["error"] for row in rows if row["error"]}
+    assert list(errors) == ["nowhere"] and "Could not resolve place 'Xyzzyville'" in errors["nowhere"]
+    # The resolved place gives the same positions as its coordinates
+    suns = {row["subject"]: row["sign"] for row in rows if row["name"] == "Sun"}
+    assert suns["melbourne"] == suns["coordinates"] == "Sagittarius"
+    print(f"✅ Places resolved in workers; unknown place failed with: {errors['nowhere']}")
+
+def test_resume_keeps_checkpoints():
+    """Test that a resumed job keeps its completed chunks and only computes the rest."""
+    job_id = "0" * 32
+    os.makedirs(jobs._job_path(job_id, "chunks"))
+    with open(jobs._job_path(job_id, "input.ndjson"), "w", encoding="utf-8") as f:
+        for subject in ("a", "b", "c", "d"):
+            f.write(json.dumps(record(subject)) + "\n")
+    # A checkpoint from before the "restart", which a recomputation would overwrite
+    seeded = "subject,object,name,longitude,speed,sign,house,retrograde,error\r\nseeded,,,,,,,,checkpoint\r\n"
+    with open(jobs._chunk_path(job_id, 0), "w", newline="", encoding="utf-8") as f:
+        f.write(seeded)
+    with open(jobs._job_path(job_id, "job.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "id": job_id, "status": jobs.RUNNING, "total": 4, "chunk_size": 2, "failed": 0,
+            "created_at": time.time(), "finished_at": None, "error": None,
+        }, f)
+
+    jobs.resume()
+    state = wait_for(job_id)
+    assert state["status"] == jobs.COMPLETE and state["failed"] == 1, state
+    with open(jobs._chunk_path(job_id, 0), newline="", encoding="utf-8") as f:
+        assert f.read() == seeded
+    with open(jobs.export(job_id, "csv"), newline="", encoding="utf-8") as f:
+        subjects = [row["subject"] for row in csv.DictReader(f)]
+    assert subjects[0] == "seeded" and set(subjects[1:]) == {"c", "d"}
+    print("✅ Resumed job kept its checkpoint and computed only the remaining chunk")
+
+def test_concurrent_exports():
+    """Test that simultaneous first downloads of the same export don't corrupt it."""
+    job_id = jobs.submit([record(str(i)) for i in range(3)])
+    assert wait_for(job_id)["status"] == jobs.COMPLETE
+    with ThreadPoolExecutor(8) as pool:
+        paths = list(pool.map(lambda _: jobs.export(job_id, "parquet"), range(8)))
+    assert len(set(paths)) == 1
+    assert pq.read_table(paths[0]).num_rows == 3 * len(main.settings.objects)
+    print("✅ Concurrent exports produce one intact file")
+
+if __name__ == "__main__":
+    print("🗂️  Testing Bulk Jobs")
+    print("=" * 50)
+    setup_module()
+    try:
+        test_job_and_exports()
+        test_all_records_failed()
+        test_places_resolved_by_workers()
+        test_resume_keeps_checkpoints()
+        test_concurrent_exports()
+    finally:
+        teardown_module()
+    print("=" * 50)
+    print("✅ Bulk job tests complete!")
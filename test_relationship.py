@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test script for synastry calculations.
+Runs in-process - no server required.
+"""
+
+from fastapi.testclient import TestClient
+from immanuel.const import chart
+
+import main  # applies the API's chart settings
+import relationship
+from chart_cache import get_natal
+
+def natal_pair():
+    native = get_natal("1991-12-10 04:59:00", -37.8136, 144.9631, None, chart.WHOLE_SIGN, wrapped=False)
+    partner = get_natal("1990-01-01 12:00:00", 40.7128, -74.0060, None, chart.WHOLE_SIGN, wrapped=False)
+    return native, partner
+
+def aspect_pairs(result, aspect_type):
+    return {
+        (index, partner_index)
+        for index, aspect_list in result["aspects"].items()
+        for partner_index, object_aspect in aspect_list.items()
+        if object_aspect.type == aspect_type
+    }
+
+def test_aspect_names_come_from_their_chart():
+    """Test that each aspect object is named from the chart it belongs to."""
+    native, partner = natal_pair()
+    for object in partner._objects.values():
+        object["name"] = f"Partner {object['name']}"
+    result = relationship.synastry(native, partner)
+    assert result["aspects"]
+    for index, aspect_list in result["aspects"].items():
+        for partner_index, object_aspect in aspect_list.items():
+            native_object, partner_object = native._objects[index], partner._objects[partner_index]
+            # The faster-moving object is the active one, whichever chart it is in
+            if abs(native_object["speed"]) > abs(partner_object["speed"]):
+                expected = (native_object["name"], partner_object["name"])
+            else:
+                expected = (partner_object["name"], native_object["name"])
+            assert (object_aspect._active_name, object_aspect._passive_name) == expected
+    print("✅ Aspect objects are named from the chart they belong to")
+
+def test_orb_overrides():
+    """Test that orb overrides change which aspects are returned, then are undone."""
+    native, partner = natal_pair()
+    default = relationship.synastry(native, partner)
+    tight = relationship.synastry(native, partner, {"trine": 0.1})
+    wide = relationship.synastry(native, partner, {"Trine": 10})
+
+    default_trines = aspect_pairs(default, "Trine")
+    assert aspect_pairs(tight, "Trine") < default_trines
+    assert aspect_pairs(wide, "Trine") > default_trines
+    # Only the overridden aspect changes
+    assert aspect_pairs(tight, "Square") == aspect_pairs(default, "Square")
+    # Overrides don't leak into later calculations
+    assert aspect_pairs(relationship.synastry(native, partner), "Trine") == default_trines
+    print(f"✅ Trine orbs: 0.1° -> {len(aspect_pairs(tight, 'Trine'))}, default -> {len(default_trines)}, 10° -> {len(aspect_pairs(wide, 'Trine'))} aspects")
+
+def test_invalid_orbs_rejected():
+    """Test that unknown aspects and negative orbs are rejected with a 422."""
+    client = TestClient(main.app)
+    subject = {"date": "1991-12-10", "time": "04:59:00", "place": "Melbourne", "latitude": -37.8136, "longitude": 144.9631}
+    for orbs in ({"trine": -3}, {"sextile": 4, "square": -0.5}, {"trines": 6}):
+        response = client.post(
+            "/synastry",
+            headers={"X-API-Key": main.config.API_KEY},
+            json={"native": subject, "partner": subject, "orbs": orbs},
+        )
+        assert response.status_code == 422, (orbs, response.text)
+        assert response.json()["detail"][0]["loc"][-1] == "orbs"
+    print("✅ Negative orbs and unknown aspects return 422")
+
+if __name__ == "__main__":
+    print("💞 Testing Synastry")
+    print("=" * 50)
+    test_aspect_names_come_from_their_chart()
+    test_orb_overrides()
+    test_invalid_orbs_rejected()
+    print("=" * 50)
+    print("✅ Synastry tests complete!")